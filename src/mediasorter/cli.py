@@ -43,6 +43,12 @@ def _pretty_print_operation(sort_operation, console, before=False):
         console.print(Text(f"⚠ {sort_operation.input_path}", style="yellow bold"))
 
 
+async def _scan_all(sorter: MediaSorter):
+    """Scan all the sources, the sorter's session is closed afterwards."""
+    async with sorter:
+        return [op async for op in sorter.scan_all()]
+
+
 def _load_config(console, config_files, verbose=False) -> MediaSorterConfig:
     """Load first valid configuration file."""
     lines = []
@@ -166,6 +172,11 @@ def _load_config(console, config_files, verbose=False) -> MediaSorterConfig:
     is_flag=True, default=False,
     help='Don\'t perform actual sorting'
 )
+@click.option(
+    '--no-cache', 'no_cache',
+    is_flag=True, default=False,
+    help="Don't use the metadata cache, query the APIs for everything again."
+)
 @click.option(
     '-c', '--config', 'config_file',
     envvar='mediasorter_CONFIG',
@@ -208,7 +219,7 @@ def _load_config(console, config_files, verbose=False) -> MediaSorterConfig:
 @click.argument('src_paths', required=False, nargs=-1)
 def cli_root(
     src_paths, dst_path, mediatype, action, infofile, shasum, chown, user, group, file_mode,
-    directory_mode, metainfo_tag, dryrun, config_file, logfile, loglevel,
+    directory_mode, metainfo_tag, dryrun, no_cache, config_file, logfile, loglevel,
     verbose, extra_verbose, quiet, yes, overwrite, dst_path_mov, dst_path_tv,
     version, setup
 ):
@@ -282,6 +293,8 @@ def cli_root(
     # CLI options override pre-configured values.
     if metainfo_tag is not None:
         config.parameters.movie.allow_metadata_tagging = metainfo_tag
+    if no_cache:
+        config.parameters.cache_dir = None
 
     # Sort TV and movie medias to their respective directories if corresponding options
     # are specified ('dst_path_tv' and 'dst_path_mov' respectively) and if 'media type'
@@ -320,7 +333,7 @@ def cli_root(
     if not verbose and not extra_verbose:
         s.start()
 
-    ops = asyncio.run(sorter.scan_all())
+    ops = asyncio.run(_scan_all(sorter))
 
     s.stop()
 
@@ -368,15 +381,16 @@ def cli_root(
     with Progress(bar, text, expand=True, transient=True) as progress:
         task = progress.add_task("Sorting", total=len(ops), visible=not quiet)
 
-        for operation in to_be_sorted:
-            progress.update(task, description=os.path.basename(operation.output_path))
-            try:
-                asyncio.run(operation.handler.commit())
-            except Exception as e:
+        def on_done(operation, exception):
+            if exception:
                 if extra_verbose:
-                    log.exception(e)
-                console.print(f"{e}", style="red bold")
-            progress.update(task, advance=1)
+                    log.exception(exception)
+                console.print(f"{exception}", style="red bold")
+            progress.update(
+                task, description=os.path.basename(operation.output_path), advance=1
+            )
+
+        asyncio.run(MediaSorter.commit_all(to_be_sorted, on_done))
 
     for sort_operation in to_be_sorted:
         _pretty_print_operation(sort_operation, console)
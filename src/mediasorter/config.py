@@ -1,9 +1,10 @@
 import os
 from enum import Enum
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, FrozenSet
 
 import yaml
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, PositiveInt, validator
 
 
 DEFAULT_CONFIG_PATHS = [
@@ -42,6 +43,20 @@ class OperationOptions(BaseModel):
     infofile: bool = False
     shasum: bool = False
 
+    @property
+    def file_mode_int(self) -> Optional[int]:
+        return parse_mode(self.file_mode) if self.file_mode else None
+
+    @property
+    def dir_mode_int(self) -> Optional[int]:
+        return parse_mode(self.dir_mode) if self.dir_mode else None
+
+
+@lru_cache(maxsize=None)
+def parse_mode(mode: str) -> int:
+    """Parse an octal permission string (e.g. '0o644' or '644') into an int."""
+    return int(mode, 8)
+
 
 class ScanConfig(BaseModel):
     """
@@ -76,12 +91,22 @@ class TvShowParams(BaseParams):
 
 
 class Parameters(BaseModel):
-    valid_extensions: List[str] = [".avi", ".mkv", ".mp4"]
+    valid_extensions: FrozenSet[str] = frozenset((".avi", ".mkv", ".mp4"))
     split_characters: List[str] = [" ", ".", "_"]
+    max_concurrency: PositiveInt = 16  # max. number of files being processed at once
+
+    # Persistent cache of the metadata lookups (None disables it), entries expire after 'cache_ttl'.
+    cache_dir: Optional[str] = os.path.join("~", ".cache", "mediasorter")
+    cache_ttl: PositiveInt = 7 * 24 * 60 * 60  # seconds
 
     tv: TvShowParams = TvShowParams()
     movie: MovieParams = MovieParams()
 
+    @validator("valid_extensions")
+    def lower_extensions(cls, extensions):
+        # Extensions are compared case-insensitively.
+        return frozenset(e.lower() for e in extensions)
+
 
 class Logging(BaseModel):
     logfile: str
@@ -1,21 +1,149 @@
 import asyncio
 import logging
+import math
 import random
 import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
-from typing import Dict, Optional, Tuple, Callable, Any
-from urllib.parse import quote
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Callable, Any, Type
+from urllib.parse import quote, urlparse
 
-import aiohttp
-from aiohttp import ClientResponseError
-from cache import AsyncLRU
+from async_lru import alru_cache
 from pydantic import BaseModel
 
 from .config import MetadataProviderApi
 from .utils import split_and_lower
 
+if TYPE_CHECKING:
+    # aiohttp is imported lazily, it's quite heavy and not needed for e.g. '--help'.
+    import aiohttp
+
 log = logging.getLogger(".".join([__package__, __name__]))
 
+THE_PLUS_PATTERN = re.compile(r"[Tt]he\+")
+
+# Apostrophes are dropped from the search terms (e.g. "Grey's Anatomy" -> "Greys Anatomy").
+STRIP_APOSTROPHES = str.maketrans("", "", "'")
+
+# Never wait longer than this for a rate limited API (seconds), whatever it says.
+MAX_RETRY_AFTER = 120.0
+
+# A single client session (connection pool) shared by all the metadata API requests,
+# created lazily on the first request (see get_session()).
+_session: Optional["aiohttp.ClientSession"] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def create_session(limit: int = 100, limit_per_host: int = 10) -> "aiohttp.ClientSession":
+    """Create a new client session (connection pool) for the metadata API requests."""
+    import aiohttp  # lazy, see the TYPE_CHECKING import
+
+    connector = aiohttp.TCPConnector(
+        limit=limit, limit_per_host=limit_per_host, enable_cleanup_closed=True, ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=60, connect=10)
+    )
+
+
+async def get_session() -> "aiohttp.ClientSession":
+    """
+    Get the shared client session, create a new one if there is none yet.
+
+    Reusing the session keeps the connections alive between requests, so only the very
+    first request to a host pays for the TCP+TLS handshake.
+    A session is bound to its event loop, close_session() must be awaited before the loop
+    ends. A session left behind by a previous loop can't be used (nor closed) any more,
+    a new one is created instead.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = create_session()
+        _session_loop = loop
+    return _session
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter: allows `rate` requests per second on average,
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request can be made (take a single token)."""
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_update) * self.rate)
+            self.last_update = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.last_update = time.monotonic()
+            self.tokens -= 1
+
+
+# Rate limiters shared by all the requests to a single host (see get_rate_limiter()).
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_rate_limiter(url: str, rate: float, burst: int) -> TokenBucket:
+    """Get the rate limiter for the URL's host, create it on first use."""
+    global _buckets_loop
+    loop = asyncio.get_running_loop()
+    if _buckets_loop is not loop:
+        _buckets.clear()  # asyncio primitives can't be shared between event loops
+        _buckets_loop = loop
+    host = urlparse(url).netloc
+    if host not in _buckets:
+        _buckets[host] = TokenBucket(rate, burst)
+    return _buckets[host]
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the 'Retry-After' header value (either delay-seconds, or an HTTP-date).
+    The delay is capped at MAX_RETRY_AFTER, nonsense (e.g. 'inf') is ignored.
+    """
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(delay):
+        return None
+    return min(MAX_RETRY_AFTER, max(0.0, delay))
+
+
+async def close_session():
+    """
+    Close the shared client session (if any), to be awaited in the same event loop
+    that used it. Only needed if the APIs were used on their own, a MediaSorter
+    (as an async context manager) passes its own session to the APIs it creates.
+    """
+    global _session, _session_loop
+    if _session is not None and not _session.closed \
+            and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+    _session, _session_loop = None, None
+
 
 class MetadataQueryError(Exception):
     pass
@@ -26,6 +154,14 @@ class MetadataNotFoundError(MetadataQueryError):
     search_term: str
 
 
+class RateLimitedError(MetadataQueryError):
+    """The API declined the request (429/503), we should wait a bit and try again."""
+
+    def __init__(self, msg: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(msg)
+        self.retry_after = retry_after  # seconds, as requested by the server (if at all)
+
+
 class TvShowMetadata(BaseModel):
     series_title: str
     season_id: int
@@ -51,7 +187,21 @@ class MetadataApi:
     url: str = None
     path: str = None
 
-    def __init__(self, config: MetadataProviderApi = None) -> None:
+    # Client side rate limiting of the requests to the API host: (requests per second, burst).
+    rate_limit: Optional[Tuple[float, int]] = None
+
+    # Can be queried alongside the other APIs. If not (e.g. a blocking client
+    # in a worker thread), all the APIs of the same type are queried one by one.
+    supports_concurrency: bool = True
+
+    # Type of the query() results (e.g. to restore them from a cache).
+    metadata_model: Optional[Type[BaseModel]] = None
+
+    def __init__(
+        self, config: MetadataProviderApi = None, session: "aiohttp.ClientSession" = None
+    ) -> None:
+        # Client session to make the requests with, the shared one (get_session()) if None.
+        self.session = session
         if config and config.key:
             self.key = config.key
         if config and config.url:
@@ -59,6 +209,15 @@ class MetadataApi:
         if config and config.path:
             self.path = config.path
 
+    # Equally configured API instances are interchangeable, which allows them
+    # to share the cached (alru_cache) method results.
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and \
+            (self.url, self.path, self.key) == (other.url, other.path, other.key)
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.url, self.path, self.key))
+
     async def query(self, *args, **kwargs):
         """
         The high level query function used to query the database. Returns media metadata
@@ -69,20 +228,34 @@ class MetadataApi:
         raise NotImplemented
 
     @staticmethod
-    @AsyncLRU(maxsize=1024)
-    async def request(url: str) -> dict:
+    @alru_cache(maxsize=1024, ttl=3600)
+    async def request(
+        url: str,
+        session: "aiohttp.ClientSession" = None,
+        rate_limit: Optional[Tuple[float, int]] = None,
+    ) -> dict:
         """
-        A wrapper around the actual request that caches a successful response is obtained.
-        Otherwise, ClientResponseError is raised.
+        A wrapper around the actual request that caches a successful response is obtained
+        (for an hour at most). Otherwise, ClientResponseError is raised
+        (RateLimitedError if the API asks us to slow down).
 
         :param url: Specify the url that we want to request
+        :param session: the client session to use (the shared one by default)
+        :param rate_limit: (requests per second, burst) to the host, only cache misses count
         :return: A json object
         """
-        log.debug(f"Network request: [GET]({url})")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()  # Raised errors don't get cached.
-                data = await response.json()
+        if rate_limit:
+            await get_rate_limiter(url, *rate_limit).acquire()
+        log.debug("Network request: [GET](%s)", url)
+        async with (session or await get_session()).get(url) as response:
+            # Raised errors don't get cached.
+            if response.status in (429, 503):
+                raise RateLimitedError(
+                    f"{response.status}, message='{response.reason}', url='{url}'",
+                    retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+                )
+            response.raise_for_status()
+            data = await response.json()
         return data
 
     async def async_fetch_json(self, url, retry=0, max_retries=4):
@@ -96,26 +269,50 @@ class MetadataApi:
         :param max_retries: int: limit the number of retries in case of a 429 or 503 errors
         :return: the result of the metadata API
         """
-        log.debug(f"fetching '{url}', retries={retry}/{max_retries}")
-        try:
-            return await MetadataApi.request(url)
-        except ClientResponseError as e:
-            # Running too many queries at once causes the API (TV Maze at the very least)
-            # to decline our requests. Simple wait and retry seems to be sufficient.
-            if e.status in (429, 503) and retry < max_retries:
-                wait_sec = random.randint(10, 100) / 100 * (retry + 1)
-                log.warning(f"Service unavailable, retrying in {wait_sec}s.")
+        from aiohttp import ClientResponseError
+
+        while True:
+            log.debug("fetching '%s', retries=%d/%d", url, retry, max_retries)
+            try:
+                return await MetadataApi.request(url, self.session, self.rate_limit)
+            except RateLimitedError as e:
+                # Running too many queries at once causes the API (TV Maze at the very least)
+                # to decline our requests. Wait as long as the API tells us to, or back off
+                # exponentially (with a bit of jitter) if it doesn't say.
+                if retry >= max_retries:
+                    raise
+                wait_sec = e.retry_after
+                if wait_sec is None:
+                    wait_sec = min(30.0, 0.5 * 2 ** retry) * (1 + random.random() * 0.5)
+                log.warning("Service unavailable, retrying in %.2fs.", wait_sec)
                 await asyncio.sleep(wait_sec)
-                return await self.async_fetch_json(url, retry + 1)
-            raise MetadataQueryError(e)
+                retry += 1
+            except ClientResponseError as e:
+                raise MetadataQueryError(e)
+
+    @alru_cache(maxsize=512, ttl=3600)
+    async def _fetch_search(self, search_title: str) -> dict:
+        """
+        Search the API for a (cleaned) title. Results are cached by the title (for an hour
+        at most, like request()), so that all the episodes of one show (or multiple versions
+        of one movie) share a single lookup.
+
+        :param search_title: the cleaned search term, see clean_search_term()
+        :return: the JSON response, see _prepare_search_result()
+        """
+        return self._prepare_search_result(await self.async_fetch_json(
+            self.url + "/" + self.path.format(title=quote(search_title))
+        ))
+
+    def _prepare_search_result(self, data: dict) -> Any:
+        """Pre-process the raw search response, only once for all the cached lookups."""
+        return data
 
     async def try_harder(
         self,
         search_term: str,
         validation_mapper: Callable[[dict, Any], Any] = None,  # must raise
         validation_callback_args: Tuple = None,
-        to_be_raised: Exception = None,
-        try_index: int = 1,
         min_len: int = 1
     ) -> Any:
         """
@@ -126,73 +323,78 @@ class MetadataApi:
         :param search_term: Search for the show
         :param validation_mapper: Validate the response data (! must raise MetadataQueryException)
         :param validation_callback_args:Tuple=None: Pass arguments to the validation callback
-        :param to_be_raised: Pass an exception to be raised once the function eventually fails.
-        :param try_index: Keep track of the number of tries
         :param min_len: set the minimum words count to be searched for.
         :return: The response data "as-is" if it matches provided validation fn.
         """
         split = search_term.split()
+        try_index = 1
+        to_be_raised = None  # "the original" exception, raised once all the tries fail
+        tried = set()
 
         while len(split) >= min_len:
             search_title = self.clean_search_term(" ".join(split))
-            # search_title = quote(search_title_in)
-            log.info(f"{try_index}. try: search='{search_title}'")
-            show_url = self.url + "/" + self.path.format(title=quote(search_title))
+            if search_title in tried:
+                # Dropped word got cleaned up anyway (e.g. "the"), no point in trying again.
+                split.pop()
+                continue
+            tried.add(search_title)
+            log.info("%d. try: search='%s'", try_index, search_title)
             try:
-                response_data = await self.async_fetch_json(show_url)
+                response_data = await self._fetch_search(search_title)
                 return await validation_mapper(response_data, search_title, *(validation_callback_args or tuple()))
             except MetadataQueryError as e:
-                log.debug(f"Invalid search result: {e}")
+                log.debug("Invalid search result: %s", e)
                 if not to_be_raised:
                     to_be_raised = e
-                return await self.try_harder(
-                    search_term=" ".join(split[:-1]),
-                    validation_mapper=validation_mapper,
-                    validation_callback_args=validation_callback_args,
-                    to_be_raised=to_be_raised,  # propagate "the original" exc
-                    try_index=try_index + 1,
-                    min_len=min_len
-                )
+            split.pop()
+            try_index += 1
+
         raise to_be_raised or MetadataQueryError(f"No exception provided, query failed: "
                                                  f"{search_term=}, {try_index}. try.")
 
     def clean_search_term(self, string, overrides: Dict[str, str] = None) -> str:
-        parts = string.split()
-        if not parts:
-            parts = [string]
+        parts = string.split() or [string]
 
         # Skip all the words "the" in the title, because TVMaze seems to choke on this.
         # * The leading 'the' needs to be preserved though...
-        first_the = None
-        if re.match('^[Tt]he$', parts[0]):
-            first_the = parts.pop(0)
-        parts = [word for word in parts if not re.match('^[Tt]he$', word)]
-        if first_the:
-            parts.insert(0, first_the)
-
-        # rejoin
-        # search_title = ' '.join(parts)  # This seems to yield better results than '+'.
+        parts = parts[:1] + [word for word in parts[1:] if word.lower() != "the"]
+
         search_title = ' '.join(parts)  # This seems to yield better results than '+'.
 
-        # search_title = title
         if overrides and search_title in overrides:
-            new_name = overrides[string]
-            log.debug(f"Overriding search title: '{string}' -> '{new_name}'")
+            new_name = overrides[search_title]
+            log.debug("Overriding search title: '%s' -> '%s'", string, new_name)
             search_title = new_name
 
-        search_title = search_title.replace("'", "")
+        search_title = search_title.translate(STRIP_APOSTROPHES)
 
         return search_title
 
 
+# Episodes by their (season, number).
+EpisodeIndex = Dict[Tuple[Any, Any], dict]
+
+
+def _index_episodes(episodes: List[dict]) -> EpisodeIndex:
+    """Index the episodes by (season, number), the first one wins if there are more."""
+    index = {}
+    for episode in episodes:
+        index.setdefault((episode.get('season'), episode.get('number')), episode)
+    return index
+
+
 class TvShowMetadataApi(MetadataApi):
 
+    metadata_model = TvShowMetadata
+
     async def query(self, title: str, season_id: int, episode_id: int) -> TvShowMetadata:
         raise NotImplemented
 
 
 class MovieMetadataApi(MetadataApi):
 
+    metadata_model = MovieMetadata
+
     async def query(self, title: str, year: str) -> MovieMetadata:
         raise NotImplemented
 
@@ -207,47 +409,68 @@ class TvMaze(TvShowMetadataApi):
     #  * "title": the show name query, extracted from the source filename
     path = "singlesearch/shows?q={title}&embed=episodes"
 
+    # TV Maze allows (at least) 20 calls every 10 seconds per IP address.
+    rate_limit = (2.0, 20)
+
+    def _prepare_search_result(self, series_data: dict) -> Tuple[dict, EpisodeIndex]:
+        # Index the embedded episodes, every episode of the show is looked up in there.
+        return series_data, _index_episodes(series_data['_embedded'].get('episodes', []))
+
+    @alru_cache(maxsize=256, ttl=3600)
+    async def _season_episodes(
+        self, series_url: str, season_id: int
+    ) -> Tuple[List[dict], EpisodeIndex]:
+        """
+        Fetch the complete episodes list of a series (including the specials)
+        and pick a single season, ordered by the air date.
+        Cached (for an hour at most), all the episodes of a season share a single fetch
+        (and sort, and index).
+
+        :param series_url: the series' "self" link
+        :param season_id: int: Specify the season number
+        :return: the season's episodes, and their index
+        """
+        alternative_url = series_url + "/episodes?specials=True"
+        log.debug("Trying alternative URL: %s", alternative_url)
+        episode_list = await self.async_fetch_json(alternative_url)
+        season_only = [e for e in episode_list if e["season"] == season_id]
+        season_only.sort(key=lambda e: e["airdate"])
+        return season_only, _index_episodes(season_only)
+
     async def _match_tv_show(
-            self, series_data: dict, search_title: str, season_id: int, episode_id: int
+            self,
+            search_result: Tuple[dict, EpisodeIndex],
+            search_title: str,
+            season_id: int,
+            episode_id: int
     ) -> Tuple[dict, dict]:
         """
         Find the correct episode in the series episodes list.
 
-        :param series_data: dict: Pass the data from _get_series_data() to _match_tv_show()
+        :param search_result: the series data (and its episodes index), see _fetch_search()
         :param season_id: int: Specify the season number
         :param episode_id: int: Specify the episode number
         :return: A dictionary with the episode data
         """
-
-        @validation
-        def find_episode(e_list):
-            for episode in e_list:
-                if episode.get('season') == season_id and episode.get('number') == episode_id:
-                    return episode
-
+        series_data, episode_index = search_result
         episode_list = series_data['_embedded'].get('episodes', [])
-        correct_episode = find_episode(episode_list)
+        correct_episode = episode_index.get((season_id, episode_id))
         if not correct_episode:
-            log.warning(f"Episode {season_id=} {episode_id=} not found.")
+            log.warning("Episode season_id=%s episode_id=%s not found.", season_id, episode_id)
 
             if series_data.get("_links") and series_data["_links"].get("self"):
-                alternative_url = series_data["_links"]["self"]["href"] + "/episodes?specials=True"
-                log.debug(f"Trying alternative URL: {alternative_url}")
-
-                episode_list = await self.async_fetch_json(alternative_url)
-
-                correct_episode = find_episode(episode_list)
+                episode_list, episode_index = await self._season_episodes(
+                    series_data["_links"]["self"]["href"], season_id
+                )
+                correct_episode = episode_index.get((season_id, episode_id))
                 if not correct_episode:
                     # One last try - maybe TV Maze does not show the episode id,
                     # e.g. a special episode (?)
-                    season_only = list(filter(lambda e: e["season"] == season_id, episode_list))
-                    season_only.sort(key=lambda e: e["airdate"])
-                    log.info(f"{len(season_only)} {episode_id=}")
-                    episode_list = season_only
-                    if len(season_only) >= episode_id:
+                    log.info("%d episode_id=%s", len(episode_list), episode_id)
+                    if len(episode_list) >= episode_id:
                         # Yay! We should have a match. Just grab the episode by index
                         # (assuming the 'air date' ordering is valid).
-                        correct_episode = season_only[episode_id - 1]
+                        correct_episode = episode_list[episode_id - 1]
 
         if not correct_episode:
             episodes = [f"S{e.get('season')}E{e.get('number')}" for e in episode_list]
@@ -286,6 +509,9 @@ class TMDB(MovieMetadataApi):
     #  * "title": the movie name query, extracted from the source filename
     path: str = "search/movie?api_key={key}&query={title}"
 
+    # Stay well within TMDB's fair use limits.
+    rate_limit = (4.0, 40)
+
     # Don't load more than this amount of pages - could get pretty crazy.
     max_pages = 5
 
@@ -300,39 +526,49 @@ class TMDB(MovieMetadataApi):
         if total_pages <= 1 or not result.get("results"):
             return result
 
-        next_page = 2
-        while next_page <= (self.max_pages if total_pages >= self.max_pages else total_pages):
-            next_page_data = await super().async_fetch_json(url + f"&page={next_page}")
-            next_page += 1
-            if next_results := next_page_data.get("results"):
-                result.get("results").extend(next_results)
+        # The total count is known after the first page, fetch all the rest at once.
+        last_page = min(self.max_pages, total_pages)
+        pages = await asyncio.gather(
+            *[super(TMDB, self).async_fetch_json(url + f"&page={page}")
+              for page in range(2, last_page + 1)],
+            return_exceptions=True
+        )
+
+        # Don't extend the (cached) first page response in place.
+        result = {**result, "results": list(result["results"])}
+        for page_data in pages:
+            if isinstance(page_data, dict) and (next_results := page_data.get("results")):
+                result["results"].extend(next_results)
 
         return result
 
-    def __init__(self, config: MetadataProviderApi = None) -> None:
-        super().__init__(config)
+    def __init__(
+        self, config: MetadataProviderApi = None, session: "aiohttp.ClientSession" = None
+    ) -> None:
+        super().__init__(config, session)
         self.path = self.path.format(key=self.key, title='{title}')
 
     def clean_search_term(self, string, overrides: Dict[str, str] = None):
         # "Sanitize" input name...
 
         # Remove the first "The" from the title when searching to avoid weird conflicts
-        search_movie_title = re.sub("[Tt]he\+", "", string, 1)
-        search_movie_title = search_movie_title.replace("'", "")
+        search_movie_title = THE_PLUS_PATTERN.sub("", string, count=1)
+        search_movie_title = search_movie_title.translate(STRIP_APOSTROPHES)
         # Apply overrides
         if overrides and (search_movie_title in overrides):
             new_name = overrides[search_movie_title]
-            log.debug(f"Overriding search title: '{search_movie_title}' -> '{new_name}'")
+            log.debug("Overriding search title: '%s' -> '%s'", search_movie_title, new_name)
             search_movie_title = new_name
 
         return search_movie_title
 
     @staticmethod
     def _parse_release_year(movie_data: dict):
-        try:
-            return int(movie_data.get('release_date', '0000-00-00').split('-')[0])
-        except (TypeError, ValueError):
-            return 0  # No release year.
+        # 'YYYY-MM-DD', possibly empty or null
+        release_date = movie_data.get('release_date') or ''
+        if len(release_date) >= 4 and release_date[:4].isdecimal():
+            return int(release_date[:4])
+        return 0  # No release year.
 
     @validation
     async def _match_movie(self, movie_data: dict, search_term, search_year: int = None):
@@ -344,11 +580,10 @@ class TMDB(MovieMetadataApi):
 
         new_result_list = result_list
         if search_year:
-            new_result_list = list(
-                filter(
-                    lambda res: abs(self._parse_release_year(res) - search_year) < 2, result_list
-                )
-            )
+            new_result_list = [
+                res for year, res in ((self._parse_release_year(r), r) for r in result_list)
+                if abs(year - search_year) < 2
+            ]
         elif len(result_list) > 2:  # We need to be careful, we want to fail here.
             raise MetadataQueryError(
                 f"{search_term}: too many results ({len(result_list)}), we cant' be sure"
@@ -357,7 +592,7 @@ class TMDB(MovieMetadataApi):
         if not new_result_list:
             raise MetadataQueryError(
                 f"Movie search produced results, BUT the requested {search_year=} not found in: "
-                f"{['{title}/{release_date}'.format(**mov) for mov in result_list]}"
+                f"{['{title}/{release_date}'.format_map(mov) for mov in result_list]}"
             )
         probable_result = new_result_list[0]
 
@@ -367,10 +602,10 @@ class TMDB(MovieMetadataApi):
 
         # Triple check: flimsy, but better than nothing...
         # Look for at least a single matching word in the result title(s).
-        search_terms = split_and_lower(search_term, alphanum_only=True)
-        actual_terms = split_and_lower(result_original_movie_title, alphanum_only=True)
-        actual_terms = actual_terms + split_and_lower(result_movie_title, alphanum_only=True)
-        if not any([t in actual_terms for t in search_terms]):
+        search_terms = frozenset(split_and_lower(search_term, alphanum_only=True))
+        actual_terms = frozenset(split_and_lower(result_original_movie_title, alphanum_only=True))
+        actual_terms |= frozenset(split_and_lower(result_movie_title, alphanum_only=True))
+        if search_terms.isdisjoint(actual_terms):
             raise MetadataQueryError(
                 f"'{search_term}': result '{result_movie_title}' probably a nonsense."
             )
@@ -15,11 +15,17 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
+import hashlib
 import logging
 import os
-import subprocess
-from itertools import chain
-from typing import Optional, List, Union, Tuple, Type, Any
+import tempfile
+from collections import defaultdict
+from functools import lru_cache, partial
+from itertools import islice
+from typing import (
+    Optional, List, Union, Tuple, Type, Any, AsyncIterable, AsyncIterator, Iterable, Dict,
+    Callable
+)
 
 from pydantic import BaseModel
 
@@ -39,6 +45,7 @@ from .metadata import (
     MovieMetadataApi,
     MetadataQueryError,
     MetadataProvider,
+    create_session,
 )
 from .parser import (
     parse_season_and_episode,
@@ -46,10 +53,17 @@ from .parser import (
     fix_leading_the,
     ParsingError
 )
-from .runner import ExecutionError, Executable
+from .runner import ExecutionError, Executable, get_io_executor
 
 log = logging.getLogger(".".join([__package__, __name__]))
 
+# Get rid of forbidden characters (I'm looking at you, Windows!)
+STRIP_ILLEGAL_CHARS = str.maketrans("", "", ":#")
+
+# The process' umask (it can only be read by setting it), see _atomic_write().
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
 
 class MediaSorterError(Exception):
     pass
@@ -93,25 +107,34 @@ class OperationHandler:
     def pre_commit(self):
         if not self.op.output_path:
             self.op.exception = CantSortError(f"Destination path missing.")
+            return
 
-        if os.path.exists(self.op.output_path):
-            log.info(f"File exists '{self.op.output_path}'")
-            if self.options.overwrite:
-                log.info(f"Removing for overwrite.")
-                os.remove(self.op.output_path)
-            else:
-                msg = f"Destination file '{self.op.output_path}' exists, overwrite not allowed."
-                log.warning(msg)
-                self.op.exception = CantSortError(msg)
+        if self.options.overwrite:
+            # Just try, no need to check for the file first.
+            try:
+                os.unlink(self.op.output_path)
+                log.info(f"File exists '{self.op.output_path}', removed for overwrite.")
+            except FileNotFoundError:
+                pass
+        elif os.path.lexists(self.op.output_path):
+            msg = f"Destination file '{self.op.output_path}' exists, overwrite not allowed."
+            log.warning(msg)
+            self.op.exception = CantSortError(msg)
 
     async def commit(self):
+        """Run the (blocking) commit in a worker thread, so that multiple commits overlap."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_io_executor(), self._commit_sync)
+
+    def _commit_sync(self):
         self.pre_commit()
         if self.op.is_error:
             return
 
         try:
-            Executable.from_action_type(self.op.action) \
-                      .commit(self.op.input_path, self.op.output_path)
+            executable = Executable.from_action_type(self.op.action, shasum=self.options.shasum)
+            executable.commit(self.op.input_path, self.op.output_path)
+            output_dir, output_name = os.path.split(self.op.output_path)
 
             uid, gid = None, None
             if self.options.chown:
@@ -120,54 +143,51 @@ class OperationHandler:
                     f"Correcting ownership and permissions: "
                     f"{uid=}, {gid=}, mode={self.options.file_mode}"
                 )
-                parent_dir = os.path.dirname(self.op.output_path)
-                os.chown(parent_dir, uid, gid)
-                os.chown(self.op.output_path, uid, gid)
-                os.chmod(self.op.output_path, int(self.options.file_mode, 8))
                 if self.options.dir_mode:
                     log.info(f"Changing parent dire mode: {self.options.dir_mode=}")
-                    os.chmod(parent_dir, int(self.options.dir_mode, 8))
+                # Resolve each path only once, then work with the file descriptor.
+                for path, mode in (
+                    (output_dir, self.options.dir_mode_int),
+                    (self.op.output_path, self.options.file_mode_int),
+                ):
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        _set_owner_and_mode(fd, uid, gid, mode)
+                    finally:
+                        os.close(fd)
 
             # Create the info file.
             if self.options.infofile:
                 info_file_name = f"{self.op.output_path}.txt"
-                log.info(f"Creating info file: .../{os.path.basename(info_file_name)}")
-                info_file_contents = [
-                    "Source filename:  {}".format(os.path.basename(self.op.output_path)),
-                    "Source directory: {}".format(os.path.dirname(self.op.output_path))
-                ]
-                with open(info_file_name, 'w') as fh:
-                    fh.write('\n'.join(info_file_contents))
-                    fh.write('\n')
-                if self.options.chown:
-                    os.chown(info_file_name, uid, gid)
-                    os.chmod(info_file_name, int(self.options.file_mode, 8))
+                log.info(f"Creating info file: .../{output_name}.txt")
+                _atomic_write(
+                    info_file_name,
+                    f"Source filename:  {output_name}\n"
+                    f"Source directory: {output_dir}\n",
+                    uid, gid, self.options.file_mode_int
+                )
 
             # Create sha256sum file
             if self.options.shasum:
                 shasum_name = '{}.sha256sum'.format(self.op.output_path)
-                log.debug(f"Generating shasum file: .../'{os.path.basename(shasum_name)}'.")
-                shasum_cmdout = subprocess.run(
-                    ['sha256sum', '-b', f'{self.op.output_path}'],
-                    capture_output=True, encoding='utf8'
-                )
-                if shasum_cmdout.returncode != 0 or not shasum_cmdout.stdout:
-                    msg = f"SHASUM checksum generation failed, " \
-                          f"out={shasum_cmdout.stdout} err={shasum_cmdout.stderr}"
+                log.debug(f"Generating shasum file: .../'{output_name}.sha256sum'.")
+                try:
+                    # Computed during the copy already? Don't read the whole file again.
+                    digest = getattr(executable, "digest", None) or \
+                        _sha256sum(self.op.output_path)
+                except OSError as e:
+                    msg = f"SHASUM checksum generation failed: {e}"
                     log.error(msg)
                     self.op.exception = MediaSorterError(msg)
                     return
 
-                shasum_data = shasum_cmdout.stdout.strip()
+                # Same format as 'sha256sum -b <path>' output.
+                shasum_data = f"{digest} *{self.op.output_path}"
                 log.info(
-                    f".../{os.path.basename(self.op.output_path)}: SHA generated {shasum_data}.")
-                with open(shasum_name, 'w') as fh:
-                    fh.write(shasum_data)
-                    fh.write('\n')
-                if self.options.chown:
-                    log.debug(f"{os.path.basename(shasum_name)}: changing owner.")
-                    os.chown(shasum_name, uid, gid)
-                    os.chmod(shasum_name, int(self.options.file_mode, 8))
+                    f".../{output_name}: SHA generated {shasum_data}.")
+                _atomic_write(
+                    shasum_name, f"{shasum_data}\n", uid, gid, self.options.file_mode_int
+                )
 
         except ExecutionError as e:
             log.error(f"Unexpected error: {e}")
@@ -175,6 +195,61 @@ class OperationHandler:
             return
 
 
+def _sha256sum(path: str, chunk_size: int = 1 << 20) -> str:
+    """Compute the file's SHA-256 hex digest, the file is read in chunks."""
+    sha = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _atomic_write(
+    path: str,
+    data: str,
+    uid: Optional[int] = None,
+    gid: Optional[int] = None,
+    mode: Optional[int] = None
+):
+    """
+    Write the file under a temporary name and rename it afterwards,
+    so that there's never a half-written file at the path (e.g. after a crash).
+
+    :param path: str: Final path of the file
+    :param data: str: The whole file contents
+    :param uid: Optional[int]: Change the ownership (and mode) if given
+    :param gid: Optional[int]: Group ID, see uid
+    :param mode: Optional[int]: File mode, see uid
+    """
+    # A unique name, so that neither concurrent writers nor an existing file get in the way.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, 'w', buffering=8192) as fh:
+            fh.write(data)
+            if uid is not None:
+                _set_owner_and_mode(fh.fileno(), uid, gid, mode)
+            if uid is None or mode is None:
+                # mkstemp() creates the file private (0600), give it the usual mode instead.
+                os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _set_owner_and_mode(fd: int, uid: int, gid: int, mode: Optional[int] = None):
+    """Change the ownership (and mode, if given) of an already opened file."""
+    os.fchown(fd, uid, gid)
+    if mode is not None:
+        os.fchmod(fd, mode)
+
+
+@lru_cache(maxsize=None)
 def _get_uid_and_gid(user_name=None, group_name=None):
     # expect ImportError on Windows
     import grp
@@ -199,6 +274,36 @@ class MediaSorter:
 
     def __init__(self, config) -> None:
         self.config = config
+        # Limits the number of metadata queries in progress (created lazily, needs a loop).
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Connection pool for all the metadata queries, see __aenter__().
+        self._session = None
+        # API instances by their type, see _get_apis().
+        self._apis = {}
+        # Metadata queries (in progress or done) by their arguments, see _query().
+        self._queries: Dict[tuple, asyncio.Future] = {}
+        # Persistent cache of the metadata query results, see _get_disk_cache().
+        self._disk_cache = None
+        self._disk_cache_opened = False  # tried to open already (even if not configured)
+
+    async def __aenter__(self):
+        # Many queries to only a few API hosts, allow plenty of connections per host.
+        self._session = create_session(limit=1024, limit_per_host=64)
+        self._apis.clear()  # bound to the previous session
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for query in self._queries.values():
+            query.cancel()  # no-op for the finished ones
+        self._queries.clear()
+        if self._session:
+            await self._session.close()
+            self._session = None
+            self._apis.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+            self._disk_cache = None
+        self._disk_cache_opened = False
 
     @classmethod
     def from_src_path(
@@ -226,11 +331,23 @@ class MediaSorter:
         config.scan_sources = scans
         return cls(config)
 
-    async def scan_all(self) -> List[Operation]:
-        """Scan all preconfigured scan sources."""
-        scan_ops = [self.scan(**scan.__dict__) for scan in self.config.scan_sources]
-        result_lists = await asyncio.gather(*scan_ops)
-        return list(chain(*result_lists))
+    async def scan_all(self) -> AsyncIterator[Operation]:
+        """
+        Scan all preconfigured scan sources at once. The operations are yielded in the order
+        of the sources, each source as soon as it (and all the ones before it) is scanned.
+        """
+        scans = [
+            asyncio.ensure_future(self.scan(**scan.__dict__)) for scan in self.config.scan_sources
+        ]
+        try:
+            for scan in scans:
+                for operation in await scan:
+                    yield operation
+        finally:
+            # Not iterated till the end (or a scan failed)? Don't leave the others running.
+            for scan in scans:
+                scan.cancel()
+            await asyncio.gather(*scans, return_exceptions=True)
 
     async def scan(
             self,
@@ -242,49 +359,89 @@ class MediaSorter:
             options: OperationOptions = OperationOptions()
     ) -> List[Operation]:
         """Scan a single source path (file or directory)."""
-        operations = []
+        scan_args = (media_type, tv_shows_output, movies_output, action, options)
 
         if os.path.isdir(src_path):
-            tasks = []
-            log.debug(f"Scanning {src_path} [{media_type}]")
-            for filename in sorted(os.listdir(src_path)):
-                child_path = os.path.join(src_path, filename)
-                tasks.append(
-                    self.scan(
-                        child_path,media_type, tv_shows_output,
-                        movies_output, action, options
-                    )
-                )
-
-            results = await asyncio.gather(*tasks)
-            for res in results:
-                operations.extend(res)
+            return await self._scan_dir(src_path, *scan_args)
         elif not os.path.exists(src_path):
             log.error(f"{src_path}: path does not exist!")
             op = Operation(input_path=src_path)
             op.exception = FileNotFoundError(f"File does not exist: '{src_path}'")
             if options:
                 op.options = options
-            operations.append(op)
+            return [op]
         else:
-            if op := await self.suggest(src_path, media_type=media_type, action=action):
-                if op.is_error:
-                    pass
-                elif op.type == MediaType.TV_SHOW and tv_shows_output:
-                    op.output_path = os.path.join(tv_shows_output, op.output_path)
-                elif op.type == MediaType.MOVIE and movies_output:
-                    op.output_path = os.path.join(movies_output, op.output_path)
-                if options:
-                    op.options = options
-                operations.append(op)
-
-        return [op for op in operations if op]
+            return await self._scan_file(src_path, *scan_args)
+
+    async def _scan_dir(self, src_path: str, *scan_args) -> List[Operation]:
+        """Scan a directory recursively, see scan()."""
+        log.debug(f"Scanning {src_path} [{scan_args[0]}]")
+
+        # Directory entries know their own type, no need to stat() every single one again.
+        with os.scandir(src_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+
+        def scan_entries():
+            for entry in entries:
+                if entry.is_dir():
+                    yield self._scan_dir(entry.path, *scan_args)
+                elif not self._is_valid_extension(entry.name):
+                    continue  # don't even bother scheduling a scan
+                elif entry.is_file():
+                    yield self._scan_file(entry.path, *scan_args)
+                else:
+                    yield self.scan(entry.path, *scan_args)  # e.g. a broken symlink
+
+        # Don't spawn a task for every single file in the directory at once. Keep a sliding
+        # window of running scans instead, the next one starts as soon as any of them is done.
+        window = self.config.parameters.max_concurrency
+        scans = enumerate(scan_entries())
+        running, results = {}, {}
+        try:
+            while True:
+                for index, scan in islice(scans, window - len(running)):
+                    running[asyncio.ensure_future(scan)] = index
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[running.pop(task)] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+
+        # Keep the directory order.
+        return [op for index in sorted(results) for op in results[index]]
+
+    async def _scan_file(
+            self,
+            src_path: str,
+            media_type: MediaType,
+            tv_shows_output: str = None,
+            movies_output: str = None,
+            action: Action = Action.COPY,
+            options: OperationOptions = None
+    ) -> List[Operation]:
+        """Scan a single (existing) file, see scan()."""
+        op = await self.suggest(src_path, media_type=media_type, action=action)
+        if not op:
+            return []
+
+        if op.is_error:
+            pass
+        elif op.type == MediaType.TV_SHOW and tv_shows_output:
+            op.output_path = os.path.join(tv_shows_output, op.output_path)
+        elif op.type == MediaType.MOVIE and movies_output:
+            op.output_path = os.path.join(movies_output, op.output_path)
+        if options:
+            op.options = options
+        return [op]
 
     @staticmethod
-    def _get_api(api: MetadataProviderApi) -> Optional[MetadataApi]:
+    def _get_api(api: MetadataProviderApi, session=None) -> Optional[MetadataApi]:
         """API instantiation and null check for the Enum(<str>)."""
         try:
-            return MetadataProvider(api.name).clazz(api)
+            return MetadataProvider(api.name).clazz(api, session=session)
         except ValueError:
             log.warning(
                 f"'{api.name}' API provider "
@@ -293,37 +450,64 @@ class MediaSorter:
 
     def _get_apis(self, type_: Type[MetadataApi]) -> List[MetadataApi]:
         """Get all available MD providers by type."""
-        return list(
-            filter(
-                lambda x: x is not None, filter(
-                    lambda provider: isinstance(provider, type_), map(
-                        lambda api: self._get_api(api), self.config.api)
-                )
-            )
-        )
+        if type_ not in self._apis:
+            self._apis[type_] = [
+                api for provider in self.config.api
+                if (api := self._get_api(provider, self._session)) is not None
+                and isinstance(api, type_)
+            ]
+        return self._apis[type_]
 
     async def _query(
         self, api_type: Type[MetadataApi], *args
     ) -> Union[TvShowMetadata, MovieMetadata]:
-        """Make an external query to find a TV-show/movie metadata."""
+        """
+        Make an external query to find a TV-show/movie metadata.
+        Cached until the sorter's context exits (and concurrent calls coalesced), so the result
+        must not be modified in place. Failed queries are not remembered.
+        """
+        key = (api_type, *args)
+        query = self._queries.get(key)
+        if query is None:
+            query = self._queries[key] = asyncio.ensure_future(self._query_apis(api_type, *args))
+
+            def forget_failed(_):
+                if (query.cancelled() or query.exception()) and self._queries.get(key) is query:
+                    del self._queries[key]
+
+            query.add_done_callback(forget_failed)
+        # Don't cancel the query for all the other callers, only stop waiting for it.
+        return await asyncio.shield(query)
+
+    async def _query_apis(
+        self, api_type: Type[MetadataApi], *args
+    ) -> Union[TvShowMetadata, MovieMetadata]:
+        """Query the APIs (or the disk cache) for the metadata, see _query()."""
         apis = self._get_apis(api_type)
         if not apis:
             msg = f"No '{api_type.__name__}' metadata provider APIs configured."
             log.error(msg)
             raise MediaSorterError(msg)
 
-        # Try to fetch info from all available APIs at once, return only the first result
-        api_queries = [asyncio.create_task(api.query(*args)) for api in apis]
+        # Looked up already (in one of the previous runs)?
+        cache_key = self._disk_cache_key(api_type, apis, args)
+        if (cached := await self._read_disk_cache(api_type, cache_key)) is not None:
+            log.debug(f"{api_type.__name__}{args}: cached result found.")
+            return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config.parameters.max_concurrency)
+
         exceptions = []
-        for api_query in asyncio.as_completed(api_queries):
-            try:
-                first_result = await api_query
-            except MetadataQueryError as e:
-                log.warning(str(e))
-                exceptions.append(e)
-                continue
-            if first_result:
-                return first_result
+        async with self._semaphore:
+            if all(api.supports_concurrency for api in apis):
+                result = await self._query_concurrently(apis, args, exceptions)
+            else:
+                # Some API can't take part in parallel queries, ask one after another.
+                result = await self._query_sequentially(apis, args, exceptions)
+        if result:
+            await self._write_disk_cache(cache_key, result)
+            return result
 
         exceptions.append(
             MediaSorterError(
@@ -333,6 +517,97 @@ class MediaSorter:
         )
         raise MediaSorterError(exceptions)
 
+    def _get_disk_cache(self):
+        """Open the persistent metadata cache (if configured), see _query()."""
+        if not self._disk_cache_opened:
+            self._disk_cache_opened = True
+            if cache_dir := self.config.parameters.cache_dir:
+                import diskcache  # not needed for e.g. '--help'
+
+                cache_dir = os.path.expanduser(cache_dir)
+                try:
+                    self._disk_cache = diskcache.Cache(cache_dir)
+                except Exception as e:
+                    log.warning(f"Can't open the metadata cache in '{cache_dir}', disabled: {e}")
+        return self._disk_cache
+
+    @staticmethod
+    def _disk_cache_key(api_type: Type[MetadataApi], apis: List[MetadataApi], args: tuple):
+        """The query's key in the persistent cache, see _query_apis()."""
+        # Differently configured APIs may find something else. Hashed, so that the API keys
+        # don't end up in the cache.
+        providers = repr([(type(api).__name__, api.url, api.path, api.key) for api in apis])
+        return api_type.__name__, hashlib.sha256(providers.encode()).hexdigest(), repr(args)
+
+    async def _read_disk_cache(
+        self, api_type: Type[MetadataApi], cache_key: tuple
+    ) -> Optional[BaseModel]:
+        """Look the query result up in the persistent cache, None if it's not there."""
+        disk_cache = self._get_disk_cache()
+        if disk_cache is None:
+            return None
+        # It's (sqlite) disk I/O, keep it off the event loop.
+        loop = asyncio.get_running_loop()
+        try:
+            cached = await loop.run_in_executor(get_io_executor(), disk_cache.get, cache_key)
+            if cached is not None:
+                return api_type.metadata_model.parse_obj(cached)
+        except Exception as e:
+            # E.g. locked by another (overlapping) run, or an outdated entry; ask the APIs.
+            log.warning(f"Metadata cache lookup failed: {e}")
+        return None
+
+    async def _write_disk_cache(self, cache_key: tuple, result: BaseModel):
+        """Store the query result in the persistent cache (if configured)."""
+        disk_cache = self._get_disk_cache()
+        if disk_cache is None:
+            return
+        store = partial(
+            disk_cache.set, cache_key, result.dict(), expire=self.config.parameters.cache_ttl
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(get_io_executor(), store)
+        except Exception as e:
+            log.warning(f"Can't store the result in the metadata cache: {e}")
+
+    @staticmethod
+    async def _query_concurrently(apis: List[MetadataApi], args: tuple, exceptions: list):
+        """Query all the APIs at once, return the first result (see _query())."""
+        pending = {asyncio.create_task(api.query(*args)) for api in apis}
+        first_result = None
+        try:
+            while pending and not first_result:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Go through all the finished ones, so that no error is left unretrieved.
+                for api_query in done:
+                    try:
+                        result = api_query.result()
+                    except MetadataQueryError as e:
+                        log.warning(str(e))
+                        exceptions.append(e)
+                        continue
+                    first_result = first_result or result
+            return first_result
+        finally:
+            # Don't leave the other queries running, they would only waste the API limits.
+            for api_query in pending:
+                api_query.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    async def _query_sequentially(apis: List[MetadataApi], args: tuple, exceptions: list):
+        """Query the APIs one by one, return the first result (see _query())."""
+        for api in apis:
+            try:
+                result = await api.query(*args)
+            except MetadataQueryError as e:
+                log.warning(str(e))
+                exceptions.append(e)
+                continue
+            if result:
+                return result
+
     async def suggest_tv_show(self, src_path: str):
         parsed_tv_show = parse_season_and_episode(
             src_path,
@@ -345,37 +620,43 @@ class MediaSorter:
             name, series, episode = parsed_tv_show
 
             log.debug(f"TV show recognized: series='{name}' S={series} E={episode}")
-            result = await self._query(TvShowMetadataApi, name, series, episode)
+            result = (await self._query(TvShowMetadataApi, name, series, episode)).copy()
 
             if self.config.parameters.tv.suffix_the:
                 result.series_title = fix_leading_the(result.series_title)
 
             # Build the final path+filename
-            season_dir = self.config.parameters.tv.dir_format.format(**result.__dict__)
-            filename = self.config.parameters.tv.file_format.format(**result.__dict__)
+            fields = result.__dict__
+            season_dir = self.config.parameters.tv.dir_format.format_map(fields)
+            filename = self.config.parameters.tv.file_format.format_map(fields)
             filename = " ".join(filename.split())
 
             return season_dir, filename
 
-    async def suggest_movie(self, src_path: str) -> Tuple[Optional[str], str]:
+    async def suggest_movie(
+        self, src_path: str, tv_parse_already_failed: bool = False
+    ) -> Tuple[Optional[str], str]:
         """
         Suggest the title of the movie, as well as its year based on an external metadata API.
 
         :param src_path: str: Specify the path to the file that is going to be moved
+        :param tv_parse_already_failed: bool: The file was already (unsuccessfully) parsed
+            as a TV show, don't try again
         :return: A final, formatted movie file name suggestion (dir and filename)
         """
-        try:
-            # Even if movie type is forced, try to find the season/episode numbers
-            # to disqualify the media file before any network requests.
-            if parse_season_and_episode(
-                    src_path,
-                    self.config.parameters.split_characters,
-                    self.config.parameters.movie.min_split_length,
-                    force=False  # We DON'T want to parse a TV show at all costs.
-            ):
-                raise MediaSorterError(f"This appears to be a TV show: {src_path}")
-        except ParsingError:
-            pass
+        if not tv_parse_already_failed:
+            try:
+                # Even if movie type is forced, try to find the season/episode numbers
+                # to disqualify the media file before any network requests.
+                if parse_season_and_episode(
+                        src_path,
+                        self.config.parameters.split_characters,
+                        self.config.parameters.movie.min_split_length,
+                        force=False  # We DON'T want to parse a TV show at all costs.
+                ):
+                    raise MediaSorterError(f"This appears to be a TV show: {src_path}")
+            except ParsingError:
+                pass
 
         movie, year, metainfo = parse_movie_name(
             src_path,
@@ -384,18 +665,19 @@ class MediaSorter:
             self.config.metainfo_map
         )
         log.debug(f"Parsed {os.path.basename(src_path)}, {movie=} {year=}")
-        result = await self._query(MovieMetadataApi, movie, year)
+        result = (await self._query(MovieMetadataApi, movie, year)).copy()
 
         for title in self.config.parameters.movie.name_overrides:
             if title == result.title:
                 result.title = self.config.parameters.movie.name_overrides[title]
                 break
 
-        filename = self.config.parameters.movie.file_format.format(**result.__dict__)
+        fields = result.__dict__
+        filename = self.config.parameters.movie.file_format.format_map(fields)
 
         # Sort movie files in a directory.
         if self.config.parameters.movie.subdir:
-            subdir = self.config.parameters.movie.dir_format.format(**result.__dict__)
+            subdir = self.config.parameters.movie.dir_format.format_map(fields)
         else:
             subdir = None
 
@@ -406,26 +688,33 @@ class MediaSorter:
 
         return subdir, filename.strip()
 
-    async def suggest(
-            self, src_path: str, media_type: MediaType = MediaType.AUTO, action: Action = Action.COPY
-    ) -> Optional[Operation]:
-
+    def _is_valid_extension(self, src_path: str) -> bool:
+        """Check the file extension against the configured valid extensions."""
         extension = os.path.splitext(src_path)[-1]
-
-        log.info(f">>> Parsing {src_path} [{media_type}]")
-
         if not extension:
             log.warning(f"{os.path.basename(src_path)}: files without extension not allowed.")
-            return None
-        elif extension and extension not in self.config.parameters.valid_extensions:
+            return False
+        elif extension.lower() not in self.config.parameters.valid_extensions:
             log.warning(
                 f"{os.path.basename(src_path)}: extension '{extension}' not allowed, "
-                f"not in {self.config.parameters.valid_extensions}."
+                f"not in {sorted(self.config.parameters.valid_extensions)}."
             )
+            return False
+        return True
+
+    async def suggest(
+            self, src_path: str, media_type: MediaType = MediaType.AUTO, action: Action = Action.COPY
+    ) -> Optional[Operation]:
+
+        if not self._is_valid_extension(src_path):
             return None
 
+        extension = os.path.splitext(src_path)[-1]
+        log.info(f">>> Parsing {src_path} [{media_type}]")
+
         # First try to parse a TV show (series and episodes numbers)
         directory, filename = None, None
+        tv_parse_failed = False
         operation = Operation(input_path=src_path, type=MediaType.TV_SHOW, action=action)
         if media_type in [MediaType.AUTO, MediaType.TV_SHOW]:
             try:
@@ -437,6 +726,12 @@ class MediaSorter:
                     operation.exception = MediaSorterError(msg)
                     return operation
                 log.debug(msg)
+                # The (forced) TV show parsing is a superset of the movie sanity check,
+                # as long as it didn't skip any of the splits the movie parsing uses.
+                tv_parse_failed = (
+                    self.config.parameters.tv.min_split_length
+                    <= self.config.parameters.movie.min_split_length
+                )
             except (MediaSorterError, MetadataQueryError) as e:
                 operation.exception = e
                 return operation
@@ -445,7 +740,9 @@ class MediaSorter:
             # Not a TV show? Must be a movie then...
             operation.type = MediaType.MOVIE
             try:
-                directory, filename = await self.suggest_movie(src_path)
+                directory, filename = await self.suggest_movie(
+                    src_path, tv_parse_already_failed=tv_parse_failed
+                )
             except (MediaSorterError, ParsingError) as e:
                 msg = f"{os.path.basename(src_path)} can't be parsed into a movie title: {e}."
                 log.error(msg)
@@ -461,17 +758,56 @@ class MediaSorter:
         else:
             dst_path = os.path.join(filename)
 
-        # Get rid of forbidden characters (I'm looking at you, Windows!)
-        for illegal_char in (":", "#"):
-            dst_path = dst_path.replace(illegal_char, "")
-
-        dst_path += extension
+        dst_path = dst_path.translate(STRIP_ILLEGAL_CHARS) + extension
         log.debug(f"Suggested output path: {dst_path}")
         operation.output_path = dst_path
 
         return operation
 
     @staticmethod
-    async def commit_all(operations: List[Operation]) -> List[Operation]:
-        tasks = [sort_operation.handler.commit() for sort_operation in operations]
-        return await asyncio.gather(*tasks)
+    async def commit_all(
+        operations: Union[Iterable[Operation], AsyncIterable[Operation]],
+        on_done: Optional[Callable[[Operation, Optional[Exception]], None]] = None
+    ) -> List[Operation]:
+        """
+        Commit all the operations at once, the shared I/O thread pool limits how many
+        of them actually run. Operations with the same destination (e.g. the 720p and 1080p
+        releases of one episode) are committed one after another though, in the given order.
+
+        :param operations: Operations to commit, an async iterable (e.g. scan_all()) is
+            consumed as it goes, commits start while the rest is still being scanned
+        :param on_done: 'on_done(operation, exception)' is called as each one finishes,
+            an (unexpected) exception is passed to it instead of being raised
+        :return: The committed operations
+        """
+        # Overwrite checks, copies and sidecar files of the same destination would race.
+        destination_locks: Dict[Optional[str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        async def commit(operation: Operation):
+            async with destination_locks[operation.output_path]:
+                try:
+                    await operation.handler.commit()
+                except Exception as e:
+                    if on_done is None:
+                        raise
+                    on_done(operation, e)
+                else:
+                    if on_done is not None:
+                        on_done(operation, None)
+
+        committed, tasks = [], []
+        if isinstance(operations, AsyncIterable):
+            try:
+                async for sort_operation in operations:
+                    committed.append(sort_operation)
+                    tasks.append(asyncio.create_task(commit(sort_operation)))
+            except BaseException:
+                # The scan failed, let the commits in progress finish first (a copy can't
+                # be stopped half-way through anyway), then pass the error on.
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        else:
+            committed = list(operations)
+            tasks = [commit(sort_operation) for sort_operation in committed]
+        await asyncio.gather(*tasks)
+        return committed
@@ -6,14 +6,31 @@ from pathlib import Path
 
 import aiohttp
 import pytest
+import pytest_asyncio
 
 from mediasorter.config import read_config, DEFAULT_CONFIG_PATHS, MediaSorterConfig
+from mediasorter.metadata import close_session
+
+# Trending torrents that are not a single TV show episode/movie.
+SKIP_PATTERN = re.compile(
+    r"complete|WWE|UFC|AEW dynamite|season [0-9]|movie.pack|trilogy|sex", re.IGNORECASE
+)
+TORRENT_PATTERN = re.compile(r'<a href="/torrent/\d+/.*>(.*)</a>')
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def shared_session():
+    """Close the shared metadata API session after each test, it's bound to the test's loop."""
+    yield
+    await close_session()
 
 
 @pytest.fixture(scope="function")
 def test_config():
     path = Path(__file__).parent.parent / "mediasorter.sample.yml"
-    return read_config(path.absolute())
+    config = read_config(path.absolute())
+    config.parameters.cache_dir = None  # always query the APIs
+    return config
 
 
 @pytest.fixture(scope="session")
@@ -31,7 +48,9 @@ def real_config() -> MediaSorterConfig:
     for path in DEFAULT_CONFIG_PATHS:
         if not os.path.exists(path):
             continue
-        return read_config(path)
+        config = read_config(path)
+        config.parameters.cache_dir = None  # always query the APIs
+        return config
     pytest.skip(f"A real config at (one of: {DEFAULT_CONFIG_PATHS}) is needed for this test.")
 
 
@@ -70,13 +89,7 @@ async def fetch_html(url: str):
 
 
 def skip_media(string):
-    for p in (
-            r"complete", "WWE", "UFC", "AEW dynamite",
-            r"season [0-9]", r"movie.pack", "trilogy", "sex"
-    ):
-        if re.search(p, string, re.IGNORECASE):
-            return True
-        continue
+    return SKIP_PATTERN.search(string) is not None
 
 
 def fetch_trending_shows():
@@ -84,7 +97,7 @@ def fetch_trending_shows():
     url = "https://1337x.to/trending/w/tv/"
 
     html = asyncio.run(fetch_html(url))
-    torrents = re.findall('<a href="/torrent/\d+/.*>(.*)</a>', html)
+    torrents = TORRENT_PATTERN.findall(html)
     x = [f"{torr}.avi" for torr in torrents if not skip_media(torr)]
     return x
 
@@ -99,7 +112,7 @@ def fetch_trending_movies():
     url = "https://1337x.to/trending/d/movies/"
 
     document = asyncio.run(fetch_html(url))
-    torrents = re.findall('<a href="/torrent/\d+/.*>(.*)</a>', document)
+    torrents = TORRENT_PATTERN.findall(document)
     x = [f"{torr}.avi" for torr in torrents if not skip_media(torr)]
     return x
 
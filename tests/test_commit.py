@@ -1,13 +1,18 @@
+import hashlib
 import os
 import random
 import shutil
+import threading
+import time
 from tempfile import TemporaryDirectory
 
+import mock
 import pytest
 
 from mediasorter.config import ScanConfig, OperationOptions
-from mediasorter.runner import Action
-from mediasorter.sorter import MediaSorter, MediaType
+from mediasorter.runner import Action, Copy, copy_and_hash
+from mediasorter.sorter import MediaSorter, MediaType, Operation, OperationHandler, \
+    MediaSorterError, _atomic_write, _UMASK
 
 
 @pytest.fixture
@@ -44,7 +49,8 @@ async def test_operation_commit(test_config, tmp_tv_show, action):
             movies_output=tmp_dir
         )
 
-        ops = await sorter.scan_all()
+        async with sorter:
+            ops = [op async for op in sorter.scan_all()]
         assert len(ops) == 1
         op = ops[0]
         assert op.raise_error()
@@ -72,9 +78,10 @@ async def test_operation_commit_meta_files(test_config, tmp_tv_show):
             movies_output=tmp_dir,
             options=OperationOptions(infofile=True, shasum=True)
         )
-        expected_path = os.path.join(tmp_dir, *await sorter.suggest_tv_show(tmp_tv_show))
-        original_ext = os.path.splitext(tmp_tv_show)[-1]
-        await sorter.commit_all(await sorter.scan_all())
+        async with sorter:
+            expected_path = os.path.join(tmp_dir, *await sorter.suggest_tv_show(tmp_tv_show))
+            original_ext = os.path.splitext(tmp_tv_show)[-1]
+            await sorter.commit_all(sorter.scan_all())
 
         expected_files = [
             expected_path + original_ext + ext for ext in ('', ".sha256sum", ".txt")
@@ -97,9 +104,10 @@ async def test_operation_commit_meta_files_MOV(real_config, tmp_movie):
             movies_output=tmp_dir,
             options=OperationOptions(infofile=True, shasum=True)
         )
-        expected_path = os.path.join(tmp_dir, *await sorter.suggest_movie(tmp_movie))
-        original_ext = os.path.splitext(tmp_movie)[-1]
-        await sorter.commit_all(await sorter.scan_all())
+        async with sorter:
+            expected_path = os.path.join(tmp_dir, *await sorter.suggest_movie(tmp_movie))
+            original_ext = os.path.splitext(tmp_movie)[-1]
+            await sorter.commit_all(sorter.scan_all())
 
         expected_files = [
             expected_path + original_ext + ext for ext in ('', ".sha256sum", ".txt")
@@ -109,3 +117,130 @@ async def test_operation_commit_meta_files_MOV(real_config, tmp_movie):
             assert os.path.exists(path), f"\"{path}\" NOT FOUND, actual files: {list_dir}"
 
 
+def test_copy_and_hash(tmp_movie):
+    data = os.urandom(1000)  # test media files are empty
+    with open(tmp_movie, 'wb') as fh:
+        fh.write(data)
+
+    with TemporaryDirectory() as tmp_dir:
+        target = os.path.join(tmp_dir, os.path.basename(tmp_movie))
+        digest = copy_and_hash(tmp_movie, target, bufsize=16)
+
+        with open(target, 'rb') as fh:
+            assert fh.read() == data
+        assert digest == hashlib.sha256(data).hexdigest()
+
+
+def test_copy_short_copy_falls_back(tmp_movie):
+    data = os.urandom(1000)
+    with open(tmp_movie, 'wb') as fh:
+        fh.write(data)
+
+    with TemporaryDirectory() as tmp_dir:
+        target = os.path.join(tmp_dir, os.path.basename(tmp_movie))
+        # E.g. a filesystem that "copies" nothing instead of failing.
+        with mock.patch("os.copy_file_range", return_value=0, create=True):
+            assert Copy()._commit(tmp_movie, target)
+
+        with open(target, 'rb') as fh:
+            assert fh.read() == data
+
+
+@pytest.mark.asyncio
+async def test_commit_same_destination_one_by_one():
+    lock = threading.Lock()
+    running, max_running, order = {}, {}, []
+
+    def commit_sync(handler):
+        destination = handler.op.output_path
+        with lock:
+            running[destination] = running.get(destination, 0) + 1
+            max_running[destination] = max(max_running.get(destination, 0), running[destination])
+            order.append(handler.op.input_path)
+        time.sleep(0.05)
+        with lock:
+            running[destination] -= 1
+
+    operations = [
+        Operation(input_path=f"{i}.mkv", output_path=f"/dst/{dst}.mkv")
+        for i, dst in enumerate(["a", "b", "a", "b", "a"])
+    ]
+    with mock.patch.object(OperationHandler, "_commit_sync", commit_sync):
+        started = time.monotonic()
+        await MediaSorter.commit_all(operations)
+        elapsed = time.monotonic() - started
+
+    assert max_running == {"/dst/a.mkv": 1, "/dst/b.mkv": 1}
+    assert [path for path in order if path in ("0.mkv", "2.mkv", "4.mkv")] == \
+        ["0.mkv", "2.mkv", "4.mkv"]  # in the given order
+    assert elapsed < 5 * 0.05  # the different destinations still overlap
+
+
+@pytest.mark.asyncio
+async def test_commit_same_destination_overwrite(tmp_path):
+    sources = []
+    for i in range(4):
+        source = tmp_path / f"release{i}.mkv"
+        source.write_bytes(os.urandom(256 * 1024))
+        sources.append(source)
+    destination = str(tmp_path / "library" / "Show S01E01.mkv")
+    os.mkdir(tmp_path / "library")
+
+    options = OperationOptions(overwrite=True, shasum=True)
+    operations = [
+        Operation(input_path=str(source), output_path=destination, options=options)
+        for source in sources
+    ]
+    done = []
+    await MediaSorter.commit_all(operations, on_done=lambda op, e: done.append((op, e)))
+
+    assert all(e is None and not op.is_error for op, e in done) and len(done) == 4
+    data = sources[-1].read_bytes()  # the last one wins
+    with open(destination, 'rb') as fh:
+        assert fh.read() == data
+    with open(f"{destination}.sha256sum") as fh:
+        assert fh.read() == f"{hashlib.sha256(data).hexdigest()} *{destination}\n"
+
+
+@pytest.mark.asyncio
+async def test_commit_all_scan_failure():
+    committed = []
+
+    def commit_sync(handler):
+        time.sleep(0.05)
+        committed.append(handler.op.input_path)
+
+    async def scan_all():
+        yield Operation(input_path="0.mkv", output_path="/dst/0.mkv")
+        raise MediaSorterError("scan failed")
+
+    with mock.patch.object(OperationHandler, "_commit_sync", commit_sync):
+        with pytest.raises(MediaSorterError, match="scan failed"):
+            await MediaSorter.commit_all(scan_all())
+        # The commit that had already started is finished, not left behind.
+        assert committed == ["0.mkv"]
+
+
+def test_atomic_write(tmp_path):
+    path = tmp_path / "show.mkv.txt"
+    (tmp_path / "show.mkv.txt.tmp").write_text("not ours")
+
+    _atomic_write(str(path), "contents\n")
+
+    assert path.read_text() == "contents\n"
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~_UMASK  # not mkstemp()'s 0600
+    assert sorted(os.listdir(tmp_path)) == ["show.mkv.txt", "show.mkv.txt.tmp"]
+    assert (tmp_path / "show.mkv.txt.tmp").read_text() == "not ours"
+
+
+def test_atomic_write_failure(tmp_path):
+    path = tmp_path / "show.mkv.sha256sum"
+    path.write_text("old\n")
+
+    with mock.patch("mediasorter.sorter._set_owner_and_mode", side_effect=PermissionError):
+        with pytest.raises(PermissionError):
+            _atomic_write(str(path), "new\n", uid=0, gid=0, mode=0o644)
+
+    # Neither a partial file, nor the temporary one left behind.
+    assert path.read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["show.mkv.sha256sum"]
@@ -1,5 +1,12 @@
-from mediasorter.config import read_config
+from mediasorter.config import read_config, OperationOptions
 
 
 def test_sample_config(sample_config_path):
     assert read_config(sample_config_path)
+
+
+def test_operation_options_modes():
+    options = OperationOptions(file_mode="0o640", dir_mode="755")
+    assert options.file_mode_int == 0o640
+    assert options.dir_mode_int == 0o755
+    assert OperationOptions().file_mode_int is None
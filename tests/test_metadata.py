@@ -1,7 +1,12 @@
+import asyncio
+
+import mock
 import pytest
 
+from mediasorter import metadata
 from mediasorter.config import MetadataProviderApi
-from mediasorter.metadata import TvMaze, TvShowMetadata, MetadataQueryError, TMDB, MovieMetadata
+from mediasorter.metadata import TvMaze, TvShowMetadata, MetadataQueryError, TMDB, MovieMetadata, \
+    _parse_retry_after, MAX_RETRY_AFTER, TokenBucket, MetadataApi
 
 
 @pytest.fixture
@@ -166,3 +171,217 @@ async def test_query_movie(tmdb, search_terms, expected_out):
 async def test_query_movie_neg(tmdb, search_terms):
     with pytest.raises(MetadataQueryError):
         await tmdb.query(*search_terms)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("nonsense", None),
+    ("120", 120.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),  # already in the past
+    ("inf", None),
+    ("nan", None),
+    ("-5", 0.0),
+    ("1e9", MAX_RETRY_AFTER),
+    ("Fri, 31 Dec 9999 23:59:59 GMT", MAX_RETRY_AFTER),  # far in the future
+])
+def test_parse_retry_after(header, expected):
+    assert _parse_retry_after(header) == expected
+
+
+class FakeClock:
+    """Stands in for time.monotonic() and asyncio.sleep(), sleeping just moves the time."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(metadata.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(metadata.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_token_bucket(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    # The burst goes through right away.
+    for _ in range(3):
+        await bucket.acquire()
+    assert clock.sleeps == []
+
+    # Then it waits for a token to be refilled (1 / rate).
+    await bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+    # Part of a token refilled meanwhile, only the rest is waited for.
+    clock.now += 0.2
+    await bucket.acquire()
+    assert clock.sleeps[1:] == [pytest.approx(0.3)]
+
+    # A long pause refills no more than the burst.
+    clock.now += 60
+    for _ in range(3):
+        await bucket.acquire()
+    assert len(clock.sleeps) == 2
+    await bucket.acquire()
+    assert clock.sleeps[2:] == [pytest.approx(0.5)]
+
+
+class FakeResponse:
+    status = 200
+    reason = "OK"
+    headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_cache_miss_only(tv_maze):
+    session = mock.Mock()
+    session.get.return_value = FakeResponse()
+    tv_maze.session = session
+    url = f"{tv_maze.url}/rate-limit-test"
+
+    limiter = mock.Mock(acquire=mock.AsyncMock())
+    with mock.patch.object(metadata, "get_rate_limiter", return_value=limiter) as get_limiter:
+        for _ in range(3):
+            assert await tv_maze.async_fetch_json(url) == {"id": 1}
+
+    # Only the actual request took a token, the cached responses didn't.
+    get_limiter.assert_called_once_with(url, *tv_maze.rate_limit)
+    limiter.acquire.assert_awaited_once()
+    session.get.assert_called_once_with(url)
+
+
+def _episode(season, number, name, airdate=None):
+    return {"season": season, "number": number, "name": name, "airdate": airdate}
+
+
+@pytest.mark.asyncio
+async def test_tv_maze_episode_index(tv_maze):
+    series_data = {
+        "name": "Index Test Show",
+        "_links": {"self": {"href": "https://api.tvmaze.com/shows/1"}},
+        "_embedded": {"episodes": [
+            _episode(1, 1, "Pilot"), _episode(1, 2, "Second"), _episode(1, 2, "Duplicate")
+        ]},
+    }
+    specials = [
+        _episode(2, None, "Special", "2001-01-01"),
+        _episode(2, 1, "Premiere", "2001-01-02"),
+        _episode(3, 1, "Later", "2002-01-01"),
+    ]
+
+    async def fetch_json(url, *args):
+        return specials if url.endswith("/episodes?specials=True") else series_data
+
+    with mock.patch.object(tv_maze, "async_fetch_json", side_effect=fetch_json) as fetch, \
+            mock.patch.object(metadata, "_index_episodes", wraps=metadata._index_episodes) as index:
+        results = [
+            await tv_maze.query("index test show", season_id, episode_id)
+            for season_id, episode_id in ((1, 1), (1, 2), (2, 1), (2, 2), (1, 1))
+        ]
+
+    assert [r.episode_title for r in results] == [
+        "Pilot", "Second", "Premiere", "Premiere", "Pilot"  # the first one wins, or by index
+    ]
+    # Each (cached) payload got indexed only once: the search result and the season 2 list.
+    assert fetch.call_count == index.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_tmdb_pages():
+    tmdb = TMDB(config=MetadataProviderApi(name="tmdb", key="offline"))
+    tmdb.max_pages = 4
+    first_page = {"total_pages": 10, "results": [{"title": "page 1"}]}
+    started, release = [], asyncio.Event()
+
+    async def fetch_json(self, url, *args):
+        if "&page=" not in url:
+            return first_page
+        page = int(url.rsplit("=", 1)[-1])
+        started.append(page)
+        await release.wait()
+        if page == 3:
+            raise MetadataQueryError("page 3 failed")
+        return {"total_pages": 10, "results": [{"title": f"page {page}"}]}
+
+    async def release_when_started():
+        for _ in range(100):
+            if len(started) == 3:
+                break
+            await asyncio.sleep(0)
+        release.set()
+        return sorted(started)
+
+    with mock.patch.object(MetadataApi, "async_fetch_json", fetch_json):
+        result, started_at_once = await asyncio.gather(
+            tmdb.async_fetch_json("https://tmdb/search?query=x"), release_when_started()
+        )
+
+    assert started_at_once == [2, 3, 4]  # concurrently, no more than max_pages
+    assert [r["title"] for r in result["results"]] == ["page 1", "page 2", "page 4"]
+    # The (cached) first page response is left as it was.
+    assert first_page == {"total_pages": 10, "results": [{"title": "page 1"}]}
+
+
+@pytest.mark.asyncio
+async def test_try_harder_skips_repeated_search_terms(tv_maze):
+    errors = {
+        "star wars bad batch": MetadataQueryError("first"),
+        "star wars bad": MetadataQueryError("second"),
+        "star wars": MetadataQueryError("third"),
+        "star": MetadataQueryError("fourth"),
+    }
+
+    async def fetch_search(search_title):
+        raise errors[search_title]
+
+    with mock.patch.object(tv_maze, "_fetch_search", side_effect=fetch_search) as fetch:
+        with pytest.raises(MetadataQueryError, match="first"):
+            await tv_maze.try_harder("star wars the bad batch", validation_mapper=mock.AsyncMock())
+
+    # "star wars the" gets cleaned up to "star wars", which is searched for only once.
+    assert [c.args[0] for c in fetch.call_args_list] == list(errors)
+
+
+@pytest.mark.parametrize("search_term, expected", [
+    ("the good doctor", "the good doctor"),  # the leading 'the' is kept
+    ("Good Doctor The", "Good Doctor"),
+    ("star wars THE bad batch", "star wars bad batch"),
+    ("Grey's Anatomy", "Greys Anatomy"),
+])
+def test_clean_search_term(tv_maze, search_term, expected):
+    assert tv_maze.clean_search_term(search_term) == expected
+
+
+@pytest.mark.parametrize("movie_data, expected", [
+    ({"release_date": "1975-11-19"}, 1975),
+    ({"release_date": ""}, 0),
+    ({"release_date": None}, 0),
+    ({}, 0),
+])
+def test_parse_release_year(movie_data, expected):
+    assert TMDB._parse_release_year(movie_data) == expected
@@ -0,0 +1,240 @@
+import asyncio
+import gc
+import weakref
+
+import diskcache
+import mock
+import pytest
+
+from mediasorter.config import MediaSorterConfig
+from mediasorter.metadata import TvShowMetadataApi, TvShowMetadata, MetadataQueryError
+from mediasorter.sorter import MediaSorter, MediaSorterError
+
+TV_SHOW = TvShowMetadata(
+    series_title="Westworld", season_id=3, episode_id=8, episode_title="Crisis Theory"
+)
+
+
+class FakeTvShowApi(TvShowMetadataApi):
+    """Offline stand-in for a TV show metadata API, records all the queries."""
+
+    def __init__(self, result=None, error=None, log=None):
+        super().__init__()
+        self.result = result
+        self.error = error
+        self.calls = []
+        self.log = log if log is not None else []  # (start|end, api) events, shared by the APIs
+
+    async def query(self, *args):
+        self.calls.append(args)
+        self.log.append(("start", self))
+        await asyncio.sleep(0)  # let any other (concurrent) query start
+        self.log.append(("end", self))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class HangingTvShowApi(FakeTvShowApi):
+    """An API that never answers, records whether its query got cancelled."""
+
+    cancelled = False
+
+    async def query(self, *args):
+        self.calls.append(args)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class BlockingTvShowApi(FakeTvShowApi):
+    """An API that can't be queried alongside the others."""
+
+    supports_concurrency = False
+
+
+async def _query(cache_dir, *apis):
+    """Query a fresh sorter (= no in-memory cache) with the given APIs."""
+    config = MediaSorterConfig()
+    config.parameters.cache_dir = cache_dir
+    sorter = MediaSorter(config)
+    with mock.patch.object(MediaSorter, "_get_apis", return_value=list(apis)):
+        async with sorter:
+            return await sorter._query(TvShowMetadataApi, "westworld", 3, 8)
+
+
+@pytest.mark.asyncio
+async def test_query_disk_cache_hit(tmp_path):
+    api = FakeTvShowApi(result=TV_SHOW)
+    assert await _query(str(tmp_path), api) == TV_SHOW
+    assert len(api.calls) == 1
+
+    # Another run, the API isn't asked again.
+    api = FakeTvShowApi(result=TV_SHOW)
+    result = await _query(str(tmp_path), api)
+    assert isinstance(result, TvShowMetadata)
+    assert result == TV_SHOW
+    assert not api.calls
+
+
+@pytest.mark.asyncio
+async def test_query_disk_cache_failure_not_stored(tmp_path):
+    with pytest.raises(MediaSorterError):
+        await _query(str(tmp_path), FakeTvShowApi(error=MetadataQueryError("not found")))
+    with diskcache.Cache(str(tmp_path)) as cache:
+        assert len(cache) == 0
+
+    api = FakeTvShowApi(result=TV_SHOW)
+    assert await _query(str(tmp_path), api) == TV_SHOW
+    assert len(api.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_query_disk_cache_api_config(tmp_path):
+    assert await _query(str(tmp_path), FakeTvShowApi(result=TV_SHOW)) == TV_SHOW
+
+    # A differently configured API might find something else.
+    api = FakeTvShowApi(result=TV_SHOW)
+    api.url = "https://elsewhere.example.com"
+    assert await _query(str(tmp_path), api) == TV_SHOW
+    assert len(api.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_query_disk_cache_outdated_entry(tmp_path):
+    api = FakeTvShowApi(result=TV_SHOW)
+    key = MediaSorter._disk_cache_key(TvShowMetadataApi, [api], ("westworld", 3, 8))
+    with diskcache.Cache(str(tmp_path)) as cache:
+        cache.set(key, {"title": "an older format"})
+
+    assert await _query(str(tmp_path), api) == TV_SHOW
+    assert len(api.calls) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["get", "set"])
+async def test_query_disk_cache_failure(tmp_path, method):
+    api = FakeTvShowApi(result=TV_SHOW)
+    error = diskcache.Timeout("database is locked")
+    with mock.patch.object(diskcache.Cache, method, side_effect=error):
+        assert await _query(str(tmp_path), api) == TV_SHOW
+    assert len(api.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_query_disk_cache_disabled():
+    with mock.patch("diskcache.Cache") as cache:
+        for _ in range(2):
+            api = FakeTvShowApi(result=TV_SHOW)
+            assert await _query(None, api) == TV_SHOW
+            assert len(api.calls) == 1
+    cache.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_query_sequentially():
+    log = []
+    error = MetadataQueryError("blocking API failed")
+    failing = BlockingTvShowApi(error=error, log=log)
+    succeeding = FakeTvShowApi(result=TV_SHOW, log=log)
+    unused = FakeTvShowApi(result=TV_SHOW, log=log)
+
+    assert await _query(None, failing, succeeding, unused) == TV_SHOW
+
+    # One after another, stopped at the first result.
+    assert log == [("start", failing), ("end", failing), ("start", succeeding), ("end", succeeding)]
+    assert failing.calls == succeeding.calls == [("westworld", 3, 8)]
+    assert not unused.calls
+
+    exceptions = []
+    result = await MediaSorter._query_sequentially(
+        [failing, succeeding], ("westworld", 3, 8), exceptions
+    )
+    assert result == TV_SHOW
+    assert exceptions == [error]
+
+
+@pytest.mark.asyncio
+async def test_query_sequentially_all_failed():
+    errors = [MetadataQueryError("first failed"), MetadataQueryError("second failed")]
+    apis = [BlockingTvShowApi(error=errors[0]), FakeTvShowApi(error=errors[1])]
+
+    with pytest.raises(MediaSorterError) as e:
+        await _query(None, *apis)
+
+    # All the errors, in the order the APIs were asked.
+    exceptions = e.value.args[0]
+    assert exceptions[:2] == errors
+    assert isinstance(exceptions[2], MediaSorterError)
+    assert all(len(api.calls) == 1 for api in apis)
+
+
+@pytest.mark.asyncio
+async def test_query_concurrently_cancels_the_rest():
+    error = MetadataQueryError("failed")
+    failing = FakeTvShowApi(error=error)
+    succeeding = FakeTvShowApi(result=TV_SHOW)
+    hanging = HangingTvShowApi()
+
+    exceptions = []
+    result = await asyncio.wait_for(
+        MediaSorter._query_concurrently(
+            [failing, hanging, succeeding], ("westworld", 3, 8), exceptions
+        ),
+        timeout=5
+    )
+
+    assert result == TV_SHOW
+    assert exceptions == [error]
+    # All asked at once, the one still running was cancelled (and awaited) on the result.
+    assert failing.calls == hanging.calls == succeeding.calls == [("westworld", 3, 8)]
+    assert hanging.cancelled
+
+
+@pytest.mark.asyncio
+async def test_query_coalesced_per_sorter():
+    api = FakeTvShowApi(result=TV_SHOW)
+    sorter = MediaSorter(MediaSorterConfig())
+    sorter.config.parameters.cache_dir = None
+    with mock.patch.object(MediaSorter, "_get_apis", return_value=[api]):
+        async with sorter:
+            results = await asyncio.gather(
+                *[sorter._query(TvShowMetadataApi, "westworld", 3, 8) for _ in range(3)]
+            )
+            assert await sorter._query(TvShowMetadataApi, "westworld", 3, 8) == TV_SHOW
+            assert results == [TV_SHOW] * 3
+            assert len(api.calls) == 1
+
+        # Not shared beyond the context (nor between the sorters).
+        async with sorter:
+            assert await sorter._query(TvShowMetadataApi, "westworld", 3, 8) == TV_SHOW
+            assert len(api.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_failure_not_remembered():
+    api = FakeTvShowApi(error=MetadataQueryError("not found"))
+    sorter = MediaSorter(MediaSorterConfig())
+    sorter.config.parameters.cache_dir = None
+    with mock.patch.object(MediaSorter, "_get_apis", return_value=[api]):
+        async with sorter:
+            for _ in range(2):
+                with pytest.raises(MediaSorterError):
+                    await sorter._query(TvShowMetadataApi, "westworld", 3, 8)
+    assert len(api.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_sorter_released():
+    sorter = MediaSorter(MediaSorterConfig())
+    sorter.config.parameters.cache_dir = None
+    with mock.patch.object(MediaSorter, "_get_apis", return_value=[FakeTvShowApi(result=TV_SHOW)]):
+        async with sorter:
+            await sorter._query(TvShowMetadataApi, "westworld", 3, 8)
+
+    ref = weakref.ref(sorter)
+    del sorter
+    gc.collect()
+    assert ref() is None
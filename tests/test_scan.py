@@ -0,0 +1,57 @@
+import asyncio
+import os
+
+import mock
+import pytest
+
+from mediasorter.config import MediaSorterConfig, ScanConfig
+from mediasorter.sorter import MediaSorter, MediaType, Operation
+
+
+@pytest.mark.asyncio
+async def test_scan_dir_sliding_window(tmp_path):
+    names = [f"file{i}.mkv" for i in range(6)]
+    for name in names:
+        (tmp_path / name).touch()
+
+    config = MediaSorterConfig()
+    config.parameters.max_concurrency = 2
+    sorter = MediaSorter(config)
+
+    slow_file_done = asyncio.Event()
+    finished = []
+
+    async def scan_file(src_path, *args):
+        if src_path.endswith("file0.mkv"):
+            # The other files must not wait for this one (no lock-step batches).
+            await asyncio.wait_for(slow_file_done.wait(), timeout=5)
+        finished.append(os.path.basename(src_path))
+        if len(finished) == len(names) - 1:
+            slow_file_done.set()
+        return [Operation(input_path=src_path)]
+
+    with mock.patch.object(sorter, "_scan_file", side_effect=scan_file):
+        operations = await sorter.scan(str(tmp_path), media_type=MediaType.AUTO)
+
+    assert finished[-1] == "file0.mkv"
+    assert [os.path.basename(op.input_path) for op in operations] == names  # directory order
+
+
+@pytest.mark.asyncio
+async def test_scan_all_source_order():
+    config = MediaSorterConfig()
+    config.scan_sources = [ScanConfig(src_path=f"/src/{i}") for i in range(3)]
+    sorter = MediaSorter(config)
+    finished = []
+
+    async def scan(src_path, **kwargs):
+        # The first source takes the longest.
+        await asyncio.sleep(0.01 * (3 - int(src_path[-1])))
+        finished.append(src_path)
+        return [Operation(input_path=f"{src_path}/a.mkv"), Operation(input_path=f"{src_path}/b.mkv")]
+
+    with mock.patch.object(sorter, "scan", side_effect=scan):
+        operations = [op.input_path async for op in sorter.scan_all()]
+
+    assert finished == ["/src/2", "/src/1", "/src/0"]  # all scanned at once
+    assert operations == [f"/src/{i}/{name}.mkv" for i in range(3) for name in "ab"]